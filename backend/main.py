@@ -1,7 +1,9 @@
 import sys
 import os
+import json
 from typing import List, Optional
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # --- 1. Path Setup to find 'src' ---
@@ -12,6 +14,8 @@ from src.config.config import Config
 from src.document_ingestion.document_processor import DocumentProcessor
 from src.vectorstore.vectorstore import VectorStore
 from src.graph_builder.graph_builder import GraphBuilder
+from src.utils.cache import normalize_question
+from src.utils.single_flight import SingleFlight
 
 # --- 2. Pydantic Models ---
 class ChatRequest(BaseModel):
@@ -31,6 +35,13 @@ app = FastAPI(title="NLP Project RAG API")
 # Global variable to hold the initialized graph
 rag_system = None
 
+# Graph runs currently answering a normalized question
+_inflight = SingleFlight()
+
+async def run_single_flight(message: str) -> dict:
+    """Run the graph once for identical concurrent questions and share the result"""
+    return await _inflight.run(normalize_question(message), lambda: rag_system.arun(message))
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the RAG system on server startup"""
@@ -55,35 +66,61 @@ async def startup_event():
         path_to_data = os.path.join(os.path.dirname(__file__), '..', 'data')
         
         # Determine source: Prefer PDF in data/, fallback to Config URLs
-        documents = []
         if os.path.exists(path_to_data) and os.listdir(path_to_data):
-            # Load from 'data' folder (PDFs)
-            documents = doc_processor.load_from_pdf_dir(path_to_data)
+            # Reuse the persisted index unless the PDFs or chunking changed
+            source_hash = VectorStore.source_hash(
+                path_to_data, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP,
+                DocumentProcessor.LOADER_VERSION
+            )
+            if vector_store.load_vectorstore(source_hash):
+                print("📦 Loaded cached vector store.")
+            else:
+                # Load from 'data' folder (PDFs), then split and embed
+                documents = doc_processor.load_from_pdf_dir(path_to_data)
+                chunks = doc_processor.split_documents(documents)
+                vector_store.create_vectorstore(chunks, source_hash=source_hash)
         else:
             # Fallback to URLs from config
-            documents = doc_processor.process_urls(Config.DEFAULT_URLS)
+            documents = await doc_processor.aprocess_urls(Config.DEFAULT_URLS)
             
-        # Split and Embed
-        chunks = doc_processor.split_documents(documents)
-        vector_store.create_vectorstore(chunks)
+            # Split and Embed
+            chunks = doc_processor.split_documents(documents)
+            vector_store.create_vectorstore(chunks)
         
         # Build Graph
         graph_builder = GraphBuilder(
             retriever=vector_store.get_retriever(),
             llm=llm
         )
-        # Use .build() to compile the graph
+        # The graph is compiled in the constructor; assert it before serving
         rag_system = graph_builder
-        # Pre-build the graph internally
-        rag_system.build()
+        assert rag_system.build() is not None
         
-        print(f"✅ System Ready! Loaded {len(chunks)} chunks.")
+        print(f"✅ System Ready! Loaded {vector_store.count()} chunks.")
         
     except Exception as e:
         print(f"❌ Failed to initialize system: {str(e)}")
         raise e
 
+def build_citations(docs) -> List[dict]:
+    """Turn retrieved documents into citation snippets (shaped like Citation)"""
+    citations = []
+    for doc in docs or []:
+        # Extract source metadata (e.g., page number, source file)
+        meta = doc.metadata
+        source_name = meta.get('source', 'Unknown Source')
+        page_num = meta.get('page', '')
+        src_label = f"{source_name} (Page {page_num})" if page_num else source_name
+        
+        citations.append({
+            "source": src_label,
+            "page_content": doc.page_content[:200] + "..." # Snippet
+        })
+    return citations
+
 # --- 4. Chat Endpoint ---
+# Returning a plain dict lets FastAPI serialize it straight through the
+# response_model (pydantic-core) without building ChatResponse by hand
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     """
@@ -94,35 +131,53 @@ async def chat_endpoint(request: ChatRequest):
 
     try:
         # Run the graph
-        # Note: rag_system is the GraphBuilder instance, we call .run() on it
-        result = rag_system.run(request.message)
+        # Note: rag_system is the GraphBuilder instance, we await .arun() on it
+        # so the event loop keeps serving other requests while the LLM is busy;
+        # identical questions already in flight share that run
+        result = await run_single_flight(request.message)
         
         # Check if the guardrail blocked it (graph ends early)
         answer_text = result.get('answer', "")
         
         # If the answer is the strict refusal, we might not have docs
-        citations = []
-        if "retrieved_docs" in result and result['retrieved_docs']:
-            for doc in result['retrieved_docs']:
-                # Extract source metadata (e.g., page number, source file)
-                meta = doc.metadata
-                source_name = meta.get('source', 'Unknown Source')
-                page_num = meta.get('page', '')
-                src_label = f"{source_name} (Page {page_num})" if page_num else source_name
-                
-                citations.append(Citation(
-                    source=src_label,
-                    page_content=doc.page_content[:200] + "..." # Snippet
-                ))
+        citations = build_citations(result.get('retrieved_docs'))
         
-        return ChatResponse(
-            answer=answer_text,
-            citations=citations
-        )
+        return {
+            "answer": answer_text,
+            "citations": citations
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streams answer tokens as Server-Sent Events, ending with the full
+    answer and citations.
+    """
+    if not rag_system:
+        raise HTTPException(status_code=503, detail="System is still initializing")
+
+    async def event_source():
+        try:
+            async for kind, payload in rag_system.astream(request.message):
+                if kind == "token":
+                    data = {"type": "token", "content": payload}
+                else:
+                    data = {
+                        "type": "final",
+                        "answer": payload.get('answer', ""),
+                        "citations": build_citations(payload.get('retrieved_docs'))
+                    }
+                yield f"data: {json.dumps(data)}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'detail': str(e)})}\n\n"
+
+    return StreamingResponse(event_source(), media_type="text/event-stream")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Single worker so concurrent requests share one loop (and one LLM batcher);
+    # "auto" picks uvloop when it is installed
+    uvicorn.run(app, host="0.0.0.0", port=8000, workers=1, loop="auto")
\ No newline at end of file
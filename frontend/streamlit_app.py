@@ -3,6 +3,7 @@
 import streamlit as st
 import sys
 import os
+import uuid
 
 # --- 1. ROBUST PATH SETUP ---
 current_file_path = os.path.abspath(__file__)
@@ -16,10 +17,14 @@ from src.config.config import Config
 from src.document_ingestion.document_processor import DocumentProcessor
 from src.vectorstore.vectorstore import VectorStore
 from src.graph_builder.graph_builder import GraphBuilder
+from src.utils.cache import LRUCache
 
 # Page configuration
 st.set_page_config(page_title="🤖 UET Dept Agent", page_icon="🏫")
 
+# Most recent chat messages kept in session state
+MAX_HISTORY = 40
+
 # --- 2. INITIALIZATION & MEMORY ---
 def init_session_state():
     """Initialize session state for chat history"""
@@ -29,14 +34,37 @@ def init_session_state():
     # Store chat history (Messages: role, content, citations)
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    
+    # Citations live here keyed by id; messages only keep the id
+    if "cit_store" not in st.session_state:
+        st.session_state.cit_store = {}
+
+def trim_history():
+    """Keep the most recent messages and drop citations nothing refers to"""
+    messages = st.session_state.messages[-MAX_HISTORY:]
+    live_ids = {m.get("citations_id") for m in messages}
+    st.session_state.cit_store = {
+        cit_id: cits for cit_id, cits in st.session_state.cit_store.items() if cit_id in live_ids
+    }
+    st.session_state.messages = messages
+
+# LLM and embedder are cached separately from the index so clearing one
+# doesn't throw away the others' HTTP connection pools
+@st.cache_resource(show_spinner=False)
+def _cached_llm():
+    return Config.get_llm()
+
+@st.cache_resource(show_spinner=False)
+def _cached_embedder():
+    return Config.get_embeddings()
 
 @st.cache_resource
 def initialize_rag():
     """Initialize RAG with PDF ONLY"""
     try:
-        llm = Config.get_llm()
+        llm = _cached_llm()
         doc_processor = DocumentProcessor(chunk_size=Config.CHUNK_SIZE, chunk_overlap=Config.CHUNK_OVERLAP)
-        vector_store = VectorStore()
+        vector_store = VectorStore(embedding=_cached_embedder())
         
         # Load PDF from data folder
         pdf_path = os.path.join(project_root, "data")
@@ -45,18 +73,52 @@ def initialize_rag():
             st.error(f"❌ No PDF found in {pdf_path}. Please add 'UET Prospectus.pdf'.")
             return None, 0
             
-        documents = doc_processor.load_from_pdf_dir(pdf_path)
-        chunks = doc_processor.split_documents(documents)
-        vector_store.create_vectorstore(chunks)
+        # Reuse the persisted index unless the PDF or chunking changed
+        source_hash = VectorStore.source_hash(
+            pdf_path, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP, DocumentProcessor.LOADER_VERSION
+        )
+        if not vector_store.load_vectorstore(source_hash):
+            documents = doc_processor.load_from_pdf_dir(pdf_path)
+            chunks = doc_processor.split_documents(documents)
+            vector_store.create_vectorstore(chunks, source_hash=source_hash)
         
         graph_builder = GraphBuilder(retriever=vector_store.get_retriever(), llm=llm)
         graph_builder.build()
         
-        return graph_builder, len(chunks)
+        return graph_builder, vector_store.count()
     except Exception as e:
         st.error(f"Failed to initialize: {str(e)}")
         return None, 0
 
+@st.cache_resource
+def answer_cache() -> LRUCache:
+    """Finished answers shared across sessions and reruns (prompt -> result)"""
+    # Same limits the st.cache_data version used: 512 entries, 24h TTL
+    return LRUCache(max_size=512, ttl=24 * 60 * 60)
+
+def to_plain_result(result) -> dict:
+    """Convert graph output to plain dicts so it can be cached safely"""
+    return {
+        "answer": result.get("answer", ""),
+        "retrieved_docs": [
+            {"page_content": doc.page_content, "metadata": dict(doc.metadata)}
+            for doc in result.get("retrieved_docs") or []
+        ],
+    }
+
+def stream_answer(prompt: str, rag_system, sink: dict):
+    """Yield answer tokens as they are decoded, storing the final result in sink"""
+    streamed = False
+    for kind, payload in rag_system.stream(prompt):
+        if kind == "token":
+            streamed = True
+            yield payload
+        else:
+            sink.update(to_plain_result(payload))
+    # Refusals never reach the responder, so there is nothing to stream
+    if not streamed:
+        yield sink.get("answer", "")
+
 def main():
     init_session_state()
     st.title("🏫 UET Department Agent")
@@ -76,9 +138,10 @@ def main():
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
             # If there are citations stored, display them
-            if "citations" in message and message["citations"]:
+            citations = st.session_state.cit_store.get(message.get("citations_id"))
+            if citations:
                 with st.expander("📄 Source Citations"):
-                    for cit in message["citations"]:
+                    for cit in citations:
                         st.caption(f"**Source:** {cit['source']}")
                         st.text(cit['text'])
 
@@ -95,38 +158,48 @@ def main():
         # C. Generate Response
         if st.session_state.rag_system:
             with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    result = st.session_state.rag_system.run(prompt)
-                    answer_text = result['answer']
-                    
-                    # Display Answer
-                    st.markdown(answer_text)
-                    
-                    # Process Citations
-                    citation_data = []
-                    if "I only answer" not in answer_text and result.get('retrieved_docs'):
-                        with st.expander("📄 Source Citations"):
-                            for i, doc in enumerate(result['retrieved_docs'][:3], 1):
-                                meta = doc.metadata
-                                source = meta.get('source', 'Unknown')
-                                page = meta.get('page', 'N/A')
-                                
-                                # Show in UI
-                                st.caption(f"**Source {i}:** {source} (Page {page})")
-                                st.text(doc.page_content[:200] + "...")
-                                
-                                # Save for History
-                                citation_data.append({
-                                    "source": f"{source} (Page {page})",
-                                    "text": doc.page_content[:200] + "..."
-                                })
-
-                    # D. Add Assistant Message (with citations) to History
-                    st.session_state.messages.append({
-                        "role": "assistant", 
-                        "content": answer_text,
-                        "citations": citation_data
-                    })
+                # Display Answer (streamed on a cache miss)
+                cache = answer_cache()
+                result = cache.get(prompt)
+                if result is None:
+                    result = {}
+                    st.write_stream(stream_answer(prompt, st.session_state.rag_system, result))
+                    cache.set(prompt, result)
+                else:
+                    st.markdown(result['answer'])
+                answer_text = result['answer']
+                
+                # Process Citations
+                citation_data = []
+                if "I only answer" not in answer_text and result.get('retrieved_docs'):
+                    with st.expander("📄 Source Citations"):
+                        for i, doc in enumerate(result['retrieved_docs'][:3], 1):
+                            meta = doc['metadata']
+                            source = meta.get('source', 'Unknown')
+                            page = meta.get('page', 'N/A')
+                            
+                            # Show in UI
+                            st.caption(f"**Source {i}:** {source} (Page {page})")
+                            st.text(doc['page_content'][:200] + "...")
+                            
+                            # Save for History
+                            citation_data.append({
+                                "source": f"{source} (Page {page})",
+                                "text": doc['page_content'][:200] + "..."
+                            })
+
+                # D. Add Assistant Message (with a citation reference) to History
+                citations_id = None
+                if citation_data:
+                    citations_id = uuid.uuid4().hex
+                    st.session_state.cit_store[citations_id] = citation_data
+                st.session_state.messages.append({
+                    "role": "assistant", 
+                    "content": answer_text,
+                    "citations_id": citations_id
+                })
+        
+        trim_history()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
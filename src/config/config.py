@@ -3,6 +3,8 @@
 import os
 from dotenv import load_dotenv
 from langchain.chat_models import init_chat_model
+from langchain_openai import OpenAIEmbeddings
+from src.vectorstore.embeddings import TEIEmbeddings
 
 # Load environment variables
 load_dotenv()
@@ -16,10 +18,19 @@ class Config:
     # Model Configuration
     LLM_MODEL = "openai:gpt-4o"
     
+    # Optional local Text-Embeddings-Inference server; OpenAI is used when unset
+    EMBEDDINGS_URL = os.getenv("EMBEDDINGS_URL")
+    
     # Document Processing
     CHUNK_SIZE = 500
     CHUNK_OVERLAP = 50
     
+    # Persisted FAISS indexes, keyed by a hash of the source PDFs
+    VECTORSTORE_CACHE_DIR = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        ".cache"
+    )
+    
     # Default URLs
     DEFAULT_URLS = [
         "https://lilianweng.github.io/posts/2023-06-23-agent/",
@@ -30,4 +41,12 @@ class Config:
     def get_llm(cls):
         """Initialize and return the LLM model"""
         os.environ["OPENAI_API_KEY"] = cls.OPENAI_API_KEY
-        return init_chat_model(cls.LLM_MODEL)
\ No newline at end of file
+        return init_chat_model(cls.LLM_MODEL)
+    
+    @classmethod
+    def get_embeddings(cls):
+        """Initialize and return the embedding model"""
+        if cls.EMBEDDINGS_URL:
+            return TEIEmbeddings(cls.EMBEDDINGS_URL)
+        os.environ["OPENAI_API_KEY"] = cls.OPENAI_API_KEY
+        return OpenAIEmbeddings()
\ No newline at end of file
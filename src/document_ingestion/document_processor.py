@@ -1,10 +1,16 @@
 """Document processing module for loading and splitting documents"""
 
-from typing import List, Union
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Union
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 # from langchain.schema import Document
 from langchain_core.documents import Document
 from pathlib import Path
+import httpx
+from bs4 import BeautifulSoup
 from langchain_community.document_loaders import (
     WebBaseLoader,
     PyPDFLoader,
@@ -12,9 +18,69 @@ from langchain_community.document_loaders import (
     PyPDFDirectoryLoader
 )
 
+def find_pdfs(directory: Union[str, Path]) -> List[Path]:
+    """Visible *.pdf files under directory, selected like PyPDFDirectoryLoader"""
+    root = Path(directory)
+    return [
+        p for p in root.glob("**/[!.]*.pdf")
+        if p.is_file() and not any(part.startswith(".") for part in p.relative_to(root).parts)
+    ]
+
+# Pages handed to one worker process when a PDF is split across processes
+PDF_PAGES_PER_TASK = 16
+
+def _load_pdf_pages(path: str, start: int, stop: int) -> List[Document]:
+    """
+    Load pages [start, stop) of one PDF exactly as PyPDFLoader(path) would
+    (module-level so worker processes can pickle it)
+    """
+    import pypdf
+    from langchain_community.document_loaders.parsers.pdf import (
+        _merge_text_and_extras,
+        _purge_metadata,
+        _validate_metadata,
+    )
+    
+    # Same parser settings and steps as PyPDFParser.lazy_parse, restricted to a page range
+    loader = PyPDFLoader(path)
+    parser = loader.parser
+    reader = pypdf.PdfReader(loader.file_path, password=parser.password)
+    doc_metadata = _purge_metadata(
+        {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+        | dict(reader.metadata or {})
+        | {"source": loader.file_path, "total_pages": len(reader.pages)}
+    )
+    
+    documents = []
+    for page_number in range(start, stop):
+        page = reader.pages[page_number]
+        if pypdf.__version__.startswith("3"):
+            text = page.extract_text()
+        else:
+            text = page.extract_text(
+                extraction_mode=parser.extraction_mode, **parser.extraction_kwargs
+            )
+        images = parser.extract_images_from_page(page)
+        documents.append(Document(
+            page_content=_merge_text_and_extras([images], text).strip(),
+            metadata=_validate_metadata(
+                doc_metadata
+                | {"page": page_number, "page_label": reader.page_labels[page_number]}
+            ),
+        ))
+    return documents
+
+def _page_count(path: str) -> int:
+    import pypdf
+    return len(pypdf.PdfReader(path).pages)
+
 class DocumentProcessor:
     """Handles document loading and processing"""
     
+    # Identifies how PDFs are turned into documents; part of the persisted
+    # index key so a change in extraction never reuses a stale index
+    LOADER_VERSION = "pypdfloader-1"
+    
     def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
         """
         Initialize document processor
@@ -34,10 +100,42 @@ class DocumentProcessor:
         loader = WebBaseLoader(url)
         return loader.load()
 
-    def load_from_pdf_dir(self, directory: Union[str, Path]) -> List[Document]:
-        """Load documents from all PDFs inside a directory"""
-        loader = PyPDFDirectoryLoader(str(directory))
-        return loader.load()
+    def load_from_pdf_dir(
+        self, directory: Union[str, Path], max_workers: Optional[int] = None
+    ) -> List[Document]:
+        """
+        Load documents from all PDFs inside a directory
+        
+        Produces the same documents as PyPDFDirectoryLoader, but pypdf is pure
+        Python and holds the GIL, so each PDF is split into page ranges that
+        are parsed in separate processes. With one worker each PDF is loaded
+        in-process by PyPDFLoader.
+        
+        Args:
+            directory: Folder containing the PDFs
+            max_workers: Worker processes to use (defaults to CPU count)
+            
+        Returns:
+            One document per page, in file and page order
+        """
+        pdf_paths = [str(p) for p in find_pdfs(directory)]
+        
+        workers = max_workers or os.cpu_count() or 1
+        if workers <= 1 or not pdf_paths:
+            batches = [PyPDFLoader(path).load() for path in pdf_paths]
+        else:
+            tasks = []
+            for path in pdf_paths:
+                total = _page_count(path)
+                for start in range(0, total, PDF_PAGES_PER_TASK):
+                    tasks.append((path, start, min(start + PDF_PAGES_PER_TASK, total)))
+            
+            # Spawn rather than fork: callers (uvicorn, Streamlit) are already multi-threaded
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=ctx) as ex:
+                batches = list(ex.map(_load_pdf_pages, *zip(*tasks)))
+        
+        return [doc for batch in batches for doc in batch]
 
     def load_from_txt(self, file_path: Union[str, Path]) -> List[Document]:
         """Load document(s) from a TXT file"""
@@ -99,4 +197,42 @@ class DocumentProcessor:
             List of processed document chunks
         """
         docs = self.load_documents(urls)
-        return self.split_documents(docs)
\ No newline at end of file
+        return self.split_documents(docs)
+    
+    async def aload_from_urls(self, urls: List[str]) -> List[Document]:
+        """
+        Fetch all URLs concurrently and extract their page text
+        
+        Args:
+            urls: List of URLs to fetch
+            
+        Returns:
+            One document per URL
+        """
+        async with httpx.AsyncClient(http2=True, follow_redirects=True, timeout=30.0) as client:
+            responses = await asyncio.gather(*[client.get(url) for url in urls])
+        
+        docs: List[Document] = []
+        for url, response in zip(urls, responses):
+            response.raise_for_status()
+            soup = BeautifulSoup(response.text, "html.parser")
+            title = soup.title.get_text(strip=True) if soup.title else ""
+            docs.append(Document(
+                page_content=soup.get_text(),
+                metadata={"source": url, "title": title}
+            ))
+        return docs
+    
+    async def aprocess_urls(self, urls: List[str]) -> List[Document]:
+        """
+        Async version of process_urls; total fetch time is the slowest URL,
+        not the sum of all of them
+        
+        Args:
+            urls: List of URLs to process
+            
+        Returns:
+            List of processed document chunks
+        """
+        docs = await self.aload_from_urls(urls)
+        return self.split_documents(docs)
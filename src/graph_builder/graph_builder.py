@@ -1,5 +1,7 @@
 """Graph builder for LangGraph workflow"""
 
+import asyncio
+import threading
 from langgraph.graph import StateGraph, END
 from src.state.agent_state import RAGState
 from src.nodes.reactnode import RAGNodes
@@ -10,48 +12,102 @@ class GraphBuilder:
     def __init__(self, retriever, llm):
         self.nodes = RAGNodes(retriever, llm)
         self.graph = None
+        # Long-lived loop (started on first sync call) that run()/stream() submit to;
+        # the LLM's async HTTP pool is bound to the loop it first ran on
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        # Compile eagerly so the first request doesn't pay for it
+        self.build()
     
     def build(self):
         """
-        Build the RAG workflow graph
+        Build the RAG workflow graph (idempotent; compiled once per builder)
         """
+        if self.graph is not None:
+            return self.graph
+        
         builder = StateGraph(RAGState)
         
         # 1. Add All Nodes
-        builder.add_node("guardrail", self.nodes.guardrail)
-        builder.add_node("retriever", self.nodes.retrieve_docs)
+        # Guardrail and retrieval run concurrently inside one node
+        builder.add_node("guard_and_retrieve", self.nodes.guard_and_retrieve)
         builder.add_node("responder", self.nodes.generate_answer)
         
         # 2. Set Entry Point (CRITICAL: Must be guardrail)
-        builder.set_entry_point("guardrail")
+        builder.set_entry_point("guard_and_retrieve")
         
         # 3. Define Conditional Logic
         def check_guardrail(state: RAGState):
             # Check if the specific refusal message is present
-            if state.answer and "I only answer department information" in state.answer:
+            answer = state.get("answer")
+            if answer and "I only answer department information" in answer:
                 return "end"
             return "continue"
 
         # 4. Add Conditional Edges
         builder.add_conditional_edges(
-            "guardrail",
+            "guard_and_retrieve",
             check_guardrail,
             {
                 "end": END,           # Stop immediately if irrelevant
-                "continue": "retriever" # Proceed to retrieval if relevant
+                "continue": "responder" # Docs are already retrieved if relevant
             }
         )
         
         # 5. Connect the rest of the graph
-        builder.add_edge("retriever", "responder")
         builder.add_edge("responder", END)
         
         self.graph = builder.compile()
         return self.graph
     
-    def run(self, question: str) -> dict:
-        if self.graph is None:
-            self.build()
+    async def arun(self, question: str) -> dict:
+        initial_state: RAGState = {"question": question}
+        return await self.graph.ainvoke(initial_state)
+
+    async def astream(self, question: str):
+        """
+        Stream the workflow for a question
         
-        initial_state = RAGState(question=question)
-        return self.graph.invoke(initial_state)
\ No newline at end of file
+        Yields ("token", text) as the responder decodes, then ("final", result)
+        with the same dict arun() would return.
+        """
+        initial_state: RAGState = {"question": question}
+        async for event in self.graph.astream_events(initial_state, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                # Only the responder's tokens are answer text; skip the guardrail's
+                if event["metadata"].get("langgraph_node") != "responder":
+                    continue
+                content = event["data"]["chunk"].content
+                if content:
+                    yield "token", content
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                yield "final", event["data"]["output"]
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop thread once and return its loop"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="rag-graph-loop", daemon=True
+                ).start()
+            return self._loop
+
+    def run(self, question: str) -> dict:
+        # Nodes are async, so sync callers (e.g. Streamlit) run them on the shared loop
+        future = asyncio.run_coroutine_threadsafe(self.arun(question), self._ensure_loop())
+        return future.result()
+
+    def stream(self, question: str):
+        """Sync version of astream() that drives it on the shared background loop"""
+        loop = self._ensure_loop()
+        events = self.astream(question)
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(events.__anext__(), loop).result()
+                except StopAsyncIteration:
+                    break
+        finally:
+            asyncio.run_coroutine_threadsafe(events.aclose(), loop).result()
\ No newline at end of file
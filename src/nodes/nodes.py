@@ -16,7 +16,7 @@ class RAGNodes:
         self.retriever = retriever
         self.llm = llm
     
-    def retrieve_docs(self, state: RAGState) -> RAGState:
+    def retrieve_docs(self, state: RAGState) -> dict:
         """
         Retrieve relevant documents node
         
@@ -24,15 +24,12 @@ class RAGNodes:
             state: Current RAG state
             
         Returns:
-            Updated RAG state with retrieved documents
+            State update with retrieved documents
         """
-        docs = self.retriever.invoke(state.question)
-        return RAGState(
-            question=state.question,
-            retrieved_docs=docs
-        )
+        docs = self.retriever.invoke(state["question"])
+        return {"retrieved_docs": docs}
     
-    def generate_answer(self, state: RAGState) -> RAGState:
+    def generate_answer(self, state: RAGState) -> dict:
         """
         Generate answer from retrieved documents node
         
@@ -40,10 +37,10 @@ class RAGNodes:
             state: Current RAG state with retrieved documents
             
         Returns:
-            Updated RAG state with generated answer
+            State update with generated answer
         """
         # Combine retrieved documents into context
-        context = "\n\n".join([doc.page_content for doc in state.retrieved_docs])
+        context = "\n\n".join([doc.page_content for doc in state.get("retrieved_docs", [])])
         
         # Create prompt
         prompt = f"""Answer the question based on the Department related context. for all the other questions answer that I only reply department related questions.
@@ -51,13 +48,9 @@ class RAGNodes:
 Context:
 {context}
 
-Question: {state.question}"""
+Question: {state["question"]}"""
         
         # Generate response
         response = self.llm.invoke(prompt)
         
-        return RAGState(
-            question=state.question,
-            retrieved_docs=state.retrieved_docs,
-            answer=response.content
-        )
\ No newline at end of file
+        return {"answer": response.content}
\ No newline at end of file
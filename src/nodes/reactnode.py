@@ -1,18 +1,45 @@
-"""LangGraph nodes for RAG workflow + ReAct Agent inside generate_content"""
+"""LangGraph nodes for RAG workflow"""
 
 from typing import List, Optional
 from src.state.agent_state import RAGState
 
 from langchain_core.documents import Document
-from langchain_core.tools import Tool
+from langchain_core.embeddings import Embeddings
 from langchain_core.messages import HumanMessage, SystemMessage
-from langgraph.prebuilt import create_react_agent
+from src.utils.cache import LRUCache, normalize_question
+from src.vectorstore.embeddings import BatchedEmbeddings
 # Import standard libraries
-import uuid
+import asyncio
+import hashlib
 
-# Wikipedia tool
-from langchain_community.utilities import WikipediaAPIWrapper
-from langchain_community.tools.wikipedia.tool import WikipediaQueryRun
+# Normalized small-talk that never needs an LLM classification
+GREETINGS = frozenset({
+    "hi", "hii", "hello", "hey", "heythere", "hithere", "yo", "salam", "assalamualaikum",
+    "goodmorning", "goodafternoon", "goodevening", "howareyou",
+    "thanks", "thankyou", "thx", "ok", "okay", "bye", "goodbye",
+})
+
+REFUSAL_MESSAGE = "I only answer department information."
+
+# Retrieved docs only feed citation snippets downstream, so state keeps a prefix
+SNIPPET_CHARS = 240
+
+def _lean_docs(docs: List[Document]) -> List[Document]:
+    """Trim documents to a citation snippet before they enter graph state"""
+    return [
+        Document(
+            page_content=d.page_content[:SNIPPET_CHARS],
+            metadata={"source": d.metadata.get("source"), "page": d.metadata.get("page")}
+        )
+        for d in docs
+    ]
+
+def _discard(task: asyncio.Task):
+    """Cancel a task whose result is no longer needed, swallowing any error it raised"""
+    task.cancel()
+    # If it already failed, cancel() is a no-op; fetch the exception so asyncio
+    # doesn't log "Task exception was never retrieved"
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
 
 class RAGNodes:
     """Contains node functions for RAG workflow"""
@@ -20,14 +47,67 @@ class RAGNodes:
     def __init__(self, retriever, llm):
         self.retriever = retriever
         self.llm = llm
-        self._agent = None
+        # Normalized question -> "YES"/"NO", so repeats skip the LLM round-trip
+        self._guard_cache = LRUCache(max_size=4096)
+        # sha1(normalized question) -> top-k docs; the prospectus is indexed once
+        # at startup, so cached results never go stale
+        self._retr_cache = LRUCache(max_size=2048)
+        # Same key -> search task, so concurrent misses share one retrieval
+        self._retr_inflight = {}
+        self._install_batched_embeddings()
 
-    def guardrail(self, state: RAGState) -> RAGState:
+    def _install_batched_embeddings(self):
+        """Batch concurrent query embeddings; the ANN search itself stays in-process"""
+        vectorstore = getattr(self.retriever, "vectorstore", None)
+        embedder = getattr(vectorstore, "embedding_function", None)
+        if isinstance(embedder, Embeddings) and not isinstance(embedder, BatchedEmbeddings):
+            vectorstore.embedding_function = BatchedEmbeddings(embedder, window=0.01, max_batch=32)
+
+    async def guard_and_retrieve(self, state: RAGState) -> dict:
         """
-        Strictly checks if the question is department-related.
+        Guardrail and retrieval in one node.
+
+        When the guardrail needs an LLM call, retrieval runs alongside it so its
+        latency is hidden; it is discarded if the question is refused.
         """
-        print(f"--- GUARDRAIL CHECKING: {state.question} ---") # DEBUG PRINT
+        question = state["question"]
+        print(f"--- GUARDRAIL CHECKING: {question} ---") # DEBUG PRINT
+        
+        key = normalize_question(question)
+        decision = self._known_decision(key)
+        retr_task = None
+        if decision is None:
+            # Only overlap retrieval with an actual LLM classification
+            retr_task = asyncio.create_task(self._retrieve(question))
+            try:
+                decision = await self._classify(question)
+            except BaseException:
+                _discard(retr_task)
+                raise
+            self._guard_cache.set(key, decision)
+        
+        print(f"--- GUARDRAIL DECISION: {decision} ---") # DEBUG PRINT
         
+        # Check for NO (handling punctuation like NO.)
+        if "NO" in decision:
+            if retr_task is not None:
+                _discard(retr_task)
+            return {"answer": REFUSAL_MESSAGE}
+        
+        if retr_task is None:
+            docs = await self._retrieve(question)
+        else:
+            docs = await retr_task
+        return {"retrieved_docs": _lean_docs(docs), "answer": ""}
+
+    def _known_decision(self, key: str) -> Optional[str]:
+        """Guardrail decision available without I/O (greetings, cache), else None"""
+        if key in GREETINGS:
+            return "NO"
+        return self._guard_cache.get(key)
+
+    async def _classify(self, question: str) -> str:
+        """Ask the LLM whether the question is department-related ('YES'/'NO')"""
         system_prompt = (
             "You are a strict filter for a University Department chatbot. "
             "Your ONLY job is to classify if the question is about the University, "
@@ -41,88 +121,61 @@ class RAGNodes:
         
         messages = [
             SystemMessage(content=system_prompt),
-            HumanMessage(content=state.question)
+            HumanMessage(content=question)
         ]
         
-        response = self.llm.invoke(messages)
-        decision = response.content.strip().upper()
-        
-        print(f"--- GUARDRAIL DECISION: {decision} ---") # DEBUG PRINT
-        
-        # Check for NO (handling punctuation like NO.)
-        if "NO" in decision:
-            return RAGState(
-                question=state.question,
-                answer="I only answer department information."
-            )
+        response = await self.llm.ainvoke(messages)
+        return response.content.strip().upper()
+
+    async def _retrieve(self, question: str) -> List[Document]:
+        key = hashlib.sha1(normalize_question(question).encode("utf-8")).hexdigest()
+        docs = self._retr_cache.get(key)
+        if docs is not None:
+            return docs
         
-        # If YES, pass through (answer is empty)
-        return RAGState(question=state.question, answer="")
+        task = self._retr_inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._search(question, key))
+            self._retr_inflight[key] = task
+            task.add_done_callback(lambda t: self._search_done(key, t))
+        # Shielded so one caller giving up doesn't cancel the others' search
+        return await asyncio.shield(task)
 
-    def retrieve_docs(self, state: RAGState) -> RAGState:
-        """Classic retriever node"""
+    async def _search(self, question: str, key: str) -> List[Document]:
         print("--- RETRIEVING DOCUMENTS ---") # DEBUG PRINT
-        docs = self.retriever.invoke(state.question)
-        return RAGState(
-            question=state.question,
-            retrieved_docs=docs
-        )
+        docs = (await self.retriever.ainvoke(question))[:6]
+        self._retr_cache.set(key, docs)
+        return docs
 
-    # ... (Keep _build_tools, _build_agent, generate_answer unchanged) ...
-    def _build_tools(self) -> List[Tool]:
-        # (Paste your existing _build_tools code here)
-        def retriever_tool_fn(query: str) -> str:
-            docs: List[Document] = self.retriever.invoke(query)
-            if not docs:
-                return "No documents found."
-            merged = []
-            for i, d in enumerate(docs[:8], start=1):
-                meta = d.metadata if hasattr(d, "metadata") else {}
-                title = meta.get("title") or meta.get("source") or f"doc_{i}"
-                merged.append(f"[{i}] {title}\n{d.page_content}")
-            return "\n\n".join(merged)
-
-        retriever_tool = Tool(
-            name="retriever",
-            description="Fetch passages from indexed corpus.",
-            func=retriever_tool_fn,
-        )
+    def _search_done(self, key: str, task: asyncio.Task):
+        if self._retr_inflight.get(key) is task:
+            del self._retr_inflight[key]
+        # Nobody may be awaiting any more; mark a failure as retrieved
+        if not task.cancelled():
+            task.exception()
 
-        wiki = WikipediaQueryRun(
-            api_wrapper=WikipediaAPIWrapper(top_k_results=3, lang="en")
-        )
-        wikipedia_tool = Tool(
-            name="wikipedia",
-            description="Search Wikipedia for general knowledge.",
-            func=wiki.run,
-        )
-        return [retriever_tool, wikipedia_tool]
-
-    def _build_agent(self):
-        # (Paste your existing _build_agent code here)
-        tools = self._build_tools()
-        system_prompt = (
-            "You are a helpful RAG agent. "
-            "Prefer 'retriever' for user-provided docs only department related questions; Don't use 'wikipedia' for general knowledge. "
-            "Return only the final useful answer."
+    async def generate_answer(self, state: RAGState) -> dict:
+        """
+        Answer from the retrieved passages with a single LLM call.
+        
+        State only carries trimmed snippets, so the full passages come from
+        the retrieval cache (already warm from guard_and_retrieve).
+        """
+        docs = await self._retrieve(state["question"])
+        context = "\n\n".join(
+            f"[{i}] {d.page_content}" for i, d in enumerate(docs[:6], start=1)
         )
-        self._agent = create_react_agent(self.llm, tools=tools,prompt=system_prompt)
-
-    def generate_answer(self, state: RAGState) -> RAGState:
-        # (Paste your existing generate_answer code here)
-        if self._agent is None:
-            self._build_agent()
-
-        result = self._agent.invoke({"messages": [HumanMessage(content=state.question)]})
-
-        messages = result.get("messages", [])
-        answer: Optional[str] = None
-        if messages:
-            answer_msg = messages[-1]
-            answer = getattr(answer_msg, "content", None)
-
-        return RAGState(
-            question=state.question,
-            retrieved_docs=state.retrieved_docs,
-            answer=answer or "Could not generate answer."
-        )
\ No newline at end of file
+        
+        messages = [
+            SystemMessage(content=(
+                "You are a helpful assistant for a University Department. "
+                "Answer using ONLY the context. Cite passages as [n]. "
+                "If the context does not contain the answer, say you don't know."
+            )),
+            HumanMessage(content=f"Context:\n{context}\n\nQuestion: {state['question']}")
+        ]
+        
+        response = await self.llm.ainvoke(messages)
+        answer: Optional[str] = getattr(response, "content", None)
+        
+        return {"answer": answer or "Could not generate answer."}
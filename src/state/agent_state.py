@@ -1,14 +1,17 @@
 """RAG state definition for LangGraph"""
 
-from typing import List
-from pydantic import BaseModel
+from typing import List, TypedDict
 # from langchain.schema import Document
 from langchain_core.documents import Document
 
 
-class RAGState(BaseModel):
-    """State object for RAG workflow"""
+class RAGState(TypedDict, total=False):
+    """State object for RAG workflow
+    
+    Nodes return partial dicts with only the fields they change; LangGraph
+    merges them into the state without re-validating the whole object.
+    """
     
     question: str
-    retrieved_docs: List[Document] = []
-    answer: str = ""
\ No newline at end of file
+    retrieved_docs: List[Document]
+    answer: str
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Micro-batching helper for coalescing concurrent async calls"""
+
+import asyncio
+import contextvars
+import threading
+from typing import Any, Awaitable, Callable, List
+
+
+class MicroBatcher:
+    """Collects concurrent requests for a short window and dispatches them as one batch"""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Awaitable[List[Any]]],
+        window: float = 0.02,
+        max_batch: int = 8,
+    ):
+        """
+        Initialize micro-batcher
+
+        Args:
+            batch_fn: Coroutine function mapping a list of inputs to a list of outputs
+            window: Seconds to wait for more requests after the first one arrives
+            max_batch: Maximum number of requests dispatched in a single batch
+        """
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max_batch
+        # Each event loop gets its own queue and collector task; asyncio queues
+        # can't be shared across loops. Collectors exit once their queue drains
+        # and remove their entry, so nothing outlives (or pins) a loop.
+        self._per_loop = {}  # loop -> (queue, collector task)
+        self._lock = threading.Lock()
+        self._inflight = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue a single input and wait for its result
+
+        Args:
+            item: Input passed to batch_fn together with its neighbours
+
+        Returns:
+            The output of batch_fn for this input
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._queue_for(loop)
+        future = loop.create_future()
+        await queue.put((item, future))
+        return await future
+
+    def _queue_for(self, loop: asyncio.AbstractEventLoop) -> asyncio.Queue:
+        """Return the queue for this loop, starting its collector if needed"""
+        with self._lock:
+            state = self._per_loop.get(loop)
+            if state is None or state[1].done():
+                queue = asyncio.Queue()
+                # Start from an empty context so batched calls don't inherit the
+                # callbacks/tracing config of whichever request happened to come first
+                worker = contextvars.Context().run(loop.create_task, self._collect(loop, queue))
+                worker.add_done_callback(lambda task: self._forget(loop, task))
+                state = (queue, worker)
+                self._per_loop[loop] = state
+            return state[0]
+
+    def _forget(self, loop: asyncio.AbstractEventLoop, worker: asyncio.Task):
+        with self._lock:
+            state = self._per_loop.get(loop)
+            if state is not None and state[1] is worker:
+                del self._per_loop[loop]
+
+    async def _collect(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        # Started on demand by submit(); returns as soon as the queue is empty
+        while not queue.empty():
+            batch = [queue.get_nowait()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = loop.create_task(self._dispatch(batch))
+            # Keep a reference so in-flight batches are not garbage collected
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch):
+        pending = [(item, future) for item, future in batch if not future.done()]
+        if not pending:
+            return
+        try:
+            results = await self.batch_fn([item for item, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,45 @@
+"""Single-flight helper for sharing one async call among identical concurrent requests"""
+
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Runs one call per key at a time and hands its result to every concurrent caller"""
+
+    def __init__(self):
+        # key -> task running the shared call
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn() once for all concurrent callers with the same key
+
+        The call runs in its own task, so cancelling any caller (including
+        the one that started it) never cancels the call for the others.
+
+        Args:
+            key: Identifies calls that may share a result
+            fn: Coroutine function started when no call for key is in flight
+
+        Returns:
+            The result of the shared call
+        """
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(fn())
+            self._tasks[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark a failure as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,121 @@
+"""Embedding wrappers used by the vector store"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+import httpx
+from langchain_core.embeddings import Embeddings
+from src.utils.batching import MicroBatcher
+
+
+class BatchedEmbeddings(Embeddings):
+    """Wraps an embedder so concurrent async query embeddings share one batched call"""
+
+    def __init__(self, inner: Embeddings, window: float = 0.01, max_batch: int = 32):
+        """
+        Initialize batched embeddings
+
+        Args:
+            inner: Embedder doing the actual work
+            window: Seconds to collect queries before embedding them together
+            max_batch: Maximum number of queries per embedding call
+        """
+        self.inner = inner
+        self._batcher = MicroBatcher(self.inner.aembed_documents, window=window, max_batch=max_batch)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.inner.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.inner.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self._batcher.submit(text)
+
+
+
+class TEIEmbeddings(Embeddings):
+    """Client for a local Text-Embeddings-Inference server (POST /embed)"""
+
+    def __init__(self, base_url: str, batch_size: int = 32, timeout: float = 30.0):
+        """
+        Initialize TEI embeddings client
+
+        Args:
+            base_url: Server address, e.g. http://localhost:8080
+            batch_size: Texts sent per request; must not exceed the server's
+                --max-client-batch-size (32 by default)
+            timeout: Per-request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.url = self.base_url + "/embed"
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._client = httpx.Client(timeout=timeout)
+        self._async_clients = weakref.WeakKeyDictionary()  # loop -> AsyncClient
+        self._clients_lock = threading.Lock()
+        self._model_id = None
+
+    @property
+    def model_id(self) -> str:
+        """Model the server is serving, as reported by GET /info"""
+        if self._model_id is None:
+            response = self._client.get(self.base_url + "/info")
+            response.raise_for_status()
+            self._model_id = response.json()["model_id"]
+        return self._model_id
+
+    def _slices(self, texts: List[str]) -> List[List[str]]:
+        return [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+    def _embed_slice(self, texts: List[str]) -> List[List[float]]:
+        response = self._client.post(self.url, json={"inputs": texts})
+        response.raise_for_status()
+        return response.json()
+
+    def _async_client(self) -> httpx.AsyncClient:
+        # AsyncClient pools are tied to the loop that created them, so keep one
+        # long-lived client per loop instead of replacing it
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(timeout=self.timeout)
+                self._async_clients[loop] = client
+            return client
+
+    async def aclose(self):
+        """Close the HTTP clients used from the running loop and the sync path"""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._async_clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+        self._client.close()
+
+    async def _aembed_slice(self, texts: List[str]) -> List[List[float]]:
+        response = await self._async_client().post(self.url, json={"inputs": texts})
+        response.raise_for_status()
+        return response.json()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        slices = self._slices(texts)
+        if len(slices) <= 1:
+            return [vec for batch in map(self._embed_slice, slices) for vec in batch]
+        with ThreadPoolExecutor(max_workers=min(4, len(slices))) as ex:
+            return [vec for batch in ex.map(self._embed_slice, slices) for vec in batch]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        batches = await asyncio.gather(*[self._aembed_slice(s) for s in self._slices(texts)])
+        return [vec for batch in batches for vec in batch]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
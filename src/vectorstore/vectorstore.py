@@ -1,29 +1,166 @@
 """Vector store module for document embedding and retrieval"""
 
-from typing import List
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Union
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.embeddings import Embeddings
 # from langchain.schema import Document
 from langchain_core.documents import Document
+from src.config.config import Config
+from src.document_ingestion.document_processor import find_pdfs
 
 class VectorStore:
     """Manages vector store operations"""
     
-    def __init__(self):
-        """Initialize vector store with OpenAI embeddings"""
-        self.embedding = OpenAIEmbeddings()
+    # HNSW graph over 8-bit scalar-quantized vectors (4x smaller than float32)
+    INDEX_KIND = "hnsw_sq8"
+    HNSW_NEIGHBORS = 32
+    
+    # MMR keeps the 3 most relevant yet diverse chunks out of 10 candidates
+    SEARCH_KWARGS = {"k": 3, "fetch_k": 10}
+    
+    def __init__(self, embedding: Optional[Embeddings] = None):
+        """
+        Initialize vector store
+        
+        Args:
+            embedding: Embedding model to use (defaults to Config.get_embeddings())
+        """
+        self.embedding = embedding or Config.get_embeddings()
         self.vectorstore = None
         self.retriever = None
     
-    def create_vectorstore(self, documents: List[Document]):
+    @staticmethod
+    def source_hash(directory: Union[str, Path], *salt) -> str:
+        """
+        Hash the PDFs in a directory to key a persisted index
+        
+        Args:
+            directory: Folder containing the source PDFs
+            salt: Extra values (e.g. chunking settings) that change the index
+            
+        Returns:
+            Hex digest identifying this exact corpus
+        """
+        # Hash exactly the files the loader reads, keyed by their relative path
+        root = Path(directory)
+        digest = hashlib.sha1()
+        for pdf in sorted(find_pdfs(root)):
+            digest.update(pdf.relative_to(root).as_posix().encode("utf-8"))
+            with open(pdf, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        for value in salt:
+            digest.update(str(value).encode("utf-8"))
+        return digest.hexdigest()
+    
+    def _embedder_identity(self) -> str:
+        """Describe the embedding model (class, server, model name, dimensions)"""
+        parts = [type(self.embedding).__name__]
+        for attr in ("base_url", "model_id", "model", "dimensions"):
+            value = getattr(self.embedding, attr, None)
+            if value is not None:
+                parts.append(f"{attr}={value}")
+        return ";".join(parts)
+    
+    def _cache_path(self, source_hash: str) -> str:
+        # Vectors from different embedding models are not interchangeable
+        embedder = hashlib.sha1(self._embedder_identity().encode("utf-8")).hexdigest()[:12]
+        return os.path.join(
+            Config.VECTORSTORE_CACHE_DIR,
+            f"vs_{source_hash}_{self.INDEX_KIND}_{type(self.embedding).__name__}_{embedder}",
+        )
+    
+    def load_vectorstore(self, source_hash: str) -> bool:
+        """
+        Load a previously persisted index, if one exists
+        
+        Args:
+            source_hash: Hash returned by source_hash()
+            
+        Returns:
+            True if the index was loaded, False if it must be built
+        """
+        path = self._cache_path(source_hash)
+        if not os.path.isdir(path):
+            return False
+        # Guard against a cache written by a model with another vector size
+        dim = len(self.embedding.embed_query("dimension check"))
+        try:
+            # The docstore is pickled; we only ever load indexes we wrote ourselves
+            self.vectorstore = FAISS.load_local(
+                path, self.embedding, allow_dangerous_deserialization=True
+            )
+            if self.vectorstore.index.d != dim:
+                raise ValueError(f"index has {self.vectorstore.index.d} dimensions, embedder {dim}")
+        except Exception as e:
+            # A damaged cache must not block startup; drop it and rebuild
+            print(f"⚠️ Discarding unreadable vector store cache {path}: {e}")
+            shutil.rmtree(path, ignore_errors=True)
+            self.vectorstore = None
+            return False
+        self.retriever = self._as_retriever()
+        return True
+    
+    def _save(self, path: str):
+        """Write the index next to its final location, then move it into place"""
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(prefix=".tmp_vs_", dir=parent)
+        try:
+            self.vectorstore.save_local(tmp_path)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+    
+    def create_vectorstore(self, documents: List[Document], source_hash: Optional[str] = None):
         """
         Create vector store from documents
         
         Args:
             documents: List of documents to embed
+            source_hash: If given, persist the index so later starts can load it
         """
-        self.vectorstore = FAISS.from_documents(documents, self.embedding)
-        self.retriever = self.vectorstore.as_retriever()
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embedding.embed_documents(texts)
+        
+        matrix = np.asarray(vectors, dtype="float32")
+        index = faiss.IndexHNSWSQ(
+            matrix.shape[1], faiss.ScalarQuantizer.QT_8bit, self.HNSW_NEIGHBORS
+        )
+        # The quantizer learns per-dimension ranges before vectors are added
+        index.train(matrix)
+        
+        self.vectorstore = FAISS(
+            embedding_function=self.embedding,
+            index=index,
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={}
+        )
+        self.vectorstore.add_embeddings(
+            zip(texts, vectors), metadatas=[doc.metadata for doc in documents]
+        )
+        self.retriever = self._as_retriever()
+        if source_hash:
+            self._save(self._cache_path(source_hash))
+    
+    def _as_retriever(self):
+        return self.vectorstore.as_retriever(search_type="mmr", search_kwargs=self.SEARCH_KWARGS)
+    
+    def count(self) -> int:
+        """Number of chunks in the index"""
+        if self.vectorstore is None:
+            return 0
+        return self.vectorstore.index.ntotal
     
     def get_retriever(self):
         """
@@ -0,0 +1,72 @@
+"""Tests for the single-flight helper behind the /chat endpoint"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.single_flight import SingleFlight
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        results = await asyncio.gather(*(flight.run("q", work) for _ in range(5)))
+        self.assertEqual(results, ["answer"] * 5)
+        self.assertEqual(calls, 1)
+        self.assertEqual(len(flight), 0)
+
+    async def test_leader_cancelled_waiter_still_gets_result(self):
+        flight = SingleFlight()
+        started = asyncio.Event()
+        release = asyncio.Event()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            started.set()
+            await release.wait()
+            return "answer"
+
+        leader = asyncio.create_task(flight.run("q", work))
+        await started.wait()
+        waiter = asyncio.create_task(flight.run("q", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+
+        release.set()
+        self.assertEqual(await waiter, "answer")
+        self.assertEqual(calls, 1)
+        self.assertEqual(len(flight), 0)
+
+    async def test_failure_reaches_every_caller(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.run("q", work), flight.run("q", work), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(len(flight), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()